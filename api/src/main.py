@@ -4,37 +4,68 @@ Compatible with Google AI Studio's Express.js API
 """
 
 import os
-import json
+import re
+import asyncio
 import uuid
+import hashlib
+from collections import defaultdict
+from contextlib import suppress
+from itertools import islice
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-import base64
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Tuple
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
+import numpy as np
+import orjson
+import torch
 import chromadb
 from sentence_transformers import SentenceTransformer
-import psycopg2
-from psycopg2.extras import RealDictCursor
-import redis
-import magic
-from PIL import Image
-import io
+import asyncpg
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
 
 # Configuration
 MODEL_NAME = os.getenv("MODEL_NAME", "all-MiniLM-L6-v2")
 CHROMADB_HOST = os.getenv("CHROMADB_HOST", "chromadb")
 CHROMADB_PORT = int(os.getenv("CHROMADB_PORT", "8000"))
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "postgres")
+POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
 POSTGRES_DB = os.getenv("POSTGRES_DB", "omnimind")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "albs_admin")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "")
+POSTGRES_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "4"))
+POSTGRES_POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "20"))
+# Per-connection prepared statement LRU; behind pgbouncer this needs
+# transaction pooling with max_prepared_statements enabled
+POSTGRES_STATEMENT_CACHE_SIZE = int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", "1024"))
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_MAX_CONNECTIONS = 50
+QUERY_EMBEDDING_TTL = 86400  # 24 hours
+EMBED_BATCH_SIZE = 32
+EMBED_BATCH_MAX_WAIT_MS = 20
+EMBED_MAX_SEQ_LENGTH = 128  # MiniLM was trained on 128-token inputs
+SEARCH_N_RESULTS = 5
+SEARCH_BATCH_SIZE = 32
+SEARCH_BATCH_MAX_WAIT_MS = 5
+DOCUMENTS_PAGE_SIZE = 50
+DOCUMENTS_MAX_PAGE_SIZE = 200
+
+# Keyword extraction
+KEYWORD_PATTERN = re.compile(r"[^\W\d_]{4,}")  # Unicode letters only
+KEYWORD_SCAN_CHARS = 2000  # Bounds lowercasing; ~100 words of typical length
+STOPWORDS = frozenset({
+    "the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "a", "an",
+    "this", "that", "with", "from", "have", "were", "been", "will", "would",
+    "could", "should", "their", "there", "they", "them", "then", "than",
+    "what", "when", "where", "which", "while", "about", "into", "your", "also"
+})
 
 # Initialize FastAPI
-app = FastAPI(title="OmniMind API", version="1.0.0")
+app = FastAPI(title="OmniMind API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -43,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Pydantic models (matching Google's API)
@@ -69,18 +101,36 @@ class StatsResponse(BaseModel):
     tags: int
 
 # Initialize services
-def init_database():
-    """Initialize PostgreSQL database"""
-    conn = psycopg2.connect(
+def encode_json(value: Any) -> str:
+    """Serialize a value for a JSONB parameter"""
+    return orjson.dumps(value).decode()
+
+async def init_connection(conn: asyncpg.Connection):
+    """Decode JSONB columns to Python objects on every pooled connection"""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=encode_json,
+        decoder=orjson.loads,
+        schema="pg_catalog"
+    )
+
+async def init_database() -> asyncpg.Pool:
+    """Initialize PostgreSQL connection pool and schema"""
+    pool = await asyncpg.create_pool(
         host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
         database=POSTGRES_DB,
         user=POSTGRES_USER,
-        password=POSTGRES_PASSWORD
+        password=POSTGRES_PASSWORD,
+        min_size=POSTGRES_POOL_MIN_SIZE,
+        max_size=POSTGRES_POOL_MAX_SIZE,
+        statement_cache_size=POSTGRES_STATEMENT_CACHE_SIZE,
+        init=init_connection
     )
     
-    with conn.cursor() as cur:
+    async with pool.acquire() as conn:
         # Create documents table
-        cur.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS documents (
                 id TEXT PRIMARY KEY,
                 filename TEXT NOT NULL,
@@ -92,7 +142,7 @@ def init_database():
         """)
         
         # Create tags table
-        cur.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS tags (
                 id SERIAL PRIMARY KEY,
                 doc_id TEXT REFERENCES documents(id) ON DELETE CASCADE,
@@ -102,21 +152,25 @@ def init_database():
         """)
         
         # Create indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tags_doc_id ON tags(doc_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_documents_created_at ON documents(created_at DESC)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_tags_doc_id ON tags(doc_id)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_created_at_id ON documents(created_at DESC, id DESC)")
+        # Superseded by idx_documents_created_at_id, which covers the same prefix
+        await conn.execute("DROP INDEX IF EXISTS idx_documents_created_at")
+        # Lets COUNT(DISTINCT tag) run as an index-only scan
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag)")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_metadata ON documents USING GIN (metadata jsonb_path_ops)")
     
-    conn.commit()
-    return conn
+    return pool
 
-def init_chromadb():
+async def init_chromadb():
     """Initialize ChromaDB vector database"""
-    chroma_client = chromadb.HttpClient(
+    chroma_client = await chromadb.AsyncHttpClient(
         host=CHROMADB_HOST,
         port=CHROMADB_PORT
     )
     
     # Create or get collection
-    collection = chroma_client.get_or_create_collection(
+    collection = await chroma_client.get_or_create_collection(
         name="documents",
         metadata={"hnsw:space": "cosine"}
     )
@@ -126,26 +180,179 @@ def init_chromadb():
 def init_ai_model():
     """Initialize Sentence Transformers model"""
     model = SentenceTransformer(MODEL_NAME)
+    model.max_seq_length = EMBED_MAX_SEQ_LENGTH
+    model.eval()
+    if torch.cuda.is_available():
+        model = model.to("cuda").half()
     return model
 
 def init_redis():
     """Initialize Redis cache"""
-    return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+    pool = aioredis.ConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=REDIS_MAX_CONNECTIONS
+    )
+    return aioredis.Redis(connection_pool=pool)
 
-# Initialize connections
-db_conn = init_database()
-chroma_collection = init_chromadb()
+# Initialize connections (PostgreSQL and ChromaDB clients are created in startup_event)
 ai_model = init_ai_model()
 redis_client = init_redis()
 
 # Helper functions
-def cosine_similarity(vec_a, vec_b):
-    """Calculate cosine similarity between two vectors"""
-    import numpy as np
-    dot_product = np.dot(vec_a, vec_b)
-    norm_a = np.linalg.norm(vec_a)
-    norm_b = np.linalg.norm(vec_b)
-    return dot_product / (norm_a * norm_b) if norm_a > 0 and norm_b > 0 else 0.0
+class MicroBatcher:
+    """
+    Coalesce concurrent requests into batched calls.
+    Items submitted within max_wait_ms of each other (up to max_batch_size)
+    are handed to a single handler call; each caller awaits its own result.
+    
+    With concurrent=True, for I/O-bound handlers, batches are dispatched as
+    tasks so several can be in flight at once, and an item arriving while
+    nothing is in flight is sent straight away instead of waiting out the window.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        concurrent: bool = False
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.concurrent = concurrent
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.in_flight: set = set()
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        tasks = list(self.in_flight)
+        if self.task is not None:
+            tasks.append(self.task)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            idle = self.concurrent and not self.in_flight
+            deadline = loop.time() + (0 if idle else self.max_wait)
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            if self.concurrent:
+                task = asyncio.create_task(self.dispatch(batch))
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
+            else:
+                await self.dispatch(batch)
+
+    async def dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """Encode texts without autograd bookkeeping"""
+    # inference_mode is thread-local, so it is entered on the worker thread
+    with torch.inference_mode():
+        embeddings = ai_model.encode(
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            normalize_embeddings=False,
+            convert_to_numpy=True
+        )
+    # fp16 models on CUDA return float16; keep one dtype everywhere
+    embeddings = embeddings.astype(np.float32, copy=False)
+    
+    # Normalize the whole (B, D) batch at once rather than vector by vector
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings /= np.maximum(norms, 1e-12)
+    return embeddings
+
+async def embed_batch(texts: List[str]) -> List[np.ndarray]:
+    """Encode a batch of texts off the event loop"""
+    embeddings = await asyncio.to_thread(encode_texts, texts)
+    # Copy each row so a result does not keep the whole batch array alive
+    return [embedding.copy() for embedding in embeddings]
+
+async def query_batch(query_embeddings: List[np.ndarray]) -> List[Tuple[List[str], List[float]]]:
+    """Run concurrent searches as one ChromaDB query so they share HNSW traversal setup"""
+    results = await app.state.chroma_collection.query(
+        query_embeddings=np.stack(query_embeddings),
+        n_results=SEARCH_N_RESULTS,
+        include=["distances"]
+    )
+    return list(zip(results["ids"], results["distances"]))
+
+embedding_batcher = MicroBatcher(embed_batch, EMBED_BATCH_SIZE, EMBED_BATCH_MAX_WAIT_MS)
+search_batcher = MicroBatcher(query_batch, SEARCH_BATCH_SIZE, SEARCH_BATCH_MAX_WAIT_MS, concurrent=True)
+
+async def get_query_embedding(query: str) -> np.ndarray:
+    """
+    Embed a search query, reusing cached vectors for repeated queries.
+    The cache is best-effort: if Redis is unavailable the query is encoded.
+    """
+    # Keyed by model so a model change never serves vectors of the wrong dimension
+    digest = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+    key = f"qemb:f32:{MODEL_NAME}:{digest}"
+    
+    try:
+        raw = await redis_client.get(key)
+    except RedisError as e:
+        print(f"Query embedding cache read failed: {e}")
+        raw = None
+    if raw is not None:
+        return np.frombuffer(raw, dtype=np.float32)
+    
+    embedding = await embedding_batcher.submit(query)
+    try:
+        # Raw float32 bytes are 4x smaller than the JSON encoding
+        await redis_client.setex(key, QUERY_EMBEDDING_TTL, embedding.tobytes())
+    except RedisError as e:
+        print(f"Query embedding cache write failed: {e}")
+    return embedding
+
+def quantize_embedding(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Snap an embedding onto the int8 grid using a per-vector scale.
+    Cosine distance ignores the scale, so quantized vectors can be stored
+    in ChromaDB as-is and searched with unquantized query embeddings.
+    """
+    peak = float(np.max(np.abs(embedding)))
+    scale = 127.0 / peak if peak > 0 else 1.0
+    quantized = np.clip(np.round(embedding * scale), -127, 127).astype(np.int8)
+    return quantized, scale
 
 def generate_tags_and_summary(content: str, mime_type: str) -> Dict[str, Any]:
     """
@@ -155,9 +362,9 @@ def generate_tags_and_summary(content: str, mime_type: str) -> Dict[str, Any]:
     # For text content, extract key phrases
     if mime_type.startswith("text/") or mime_type == "application/json":
         # Simple keyword extraction (replace with better NLP in production)
-        words = content.lower().split()[:100]  # First 100 words
-        common_words = {"the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "a", "an"}
-        keywords = [w for w in words if w not in common_words and len(w) > 3][:5]
+        matches = KEYWORD_PATTERN.finditer(content[:KEYWORD_SCAN_CHARS].lower())
+        words = (m.group() for m in islice(matches, 100))  # First 100 words
+        keywords = list(islice((w for w in words if w not in STOPWORDS), 5))
         
         tags = list(set(keywords))[:5] or ["document", "text", "file"]
         summary = content[:200] + "..." if len(content) > 200 else content
@@ -176,44 +383,76 @@ def generate_tags_and_summary(content: str, mime_type: str) -> Dict[str, Any]:
 @app.get("/api/stats", response_model=StatsResponse)
 async def get_stats():
     """Get system statistics - matches Google's /api/stats"""
-    with db_conn.cursor(cursor_factory=RealDictCursor) as cur:
+    async with app.state.pool.acquire() as conn:
         # Document count
-        cur.execute("SELECT COUNT(*) as count FROM documents")
-        doc_count = cur.fetchone()["count"]
+        doc_count = await conn.fetchval("SELECT COUNT(*) FROM documents")
         
         # Tag count
-        cur.execute("SELECT COUNT(DISTINCT tag) as count FROM tags")
-        tag_count = cur.fetchone()["count"]
+        tag_count = await conn.fetchval("SELECT COUNT(DISTINCT tag) FROM tags")
     
     return StatsResponse(documents=doc_count, tags=tag_count)
 
-@app.get("/api/documents", response_model=List[Document])
-async def get_documents():
-    """Get all documents - matches Google's /api/documents"""
-    with db_conn.cursor(cursor_factory=RealDictCursor) as cur:
-        cur.execute("""
-            SELECT d.*, array_agg(t.tag) as tags
-            FROM documents d
-            LEFT JOIN tags t ON d.id = t.doc_id
-            GROUP BY d.id
-            ORDER BY d.created_at DESC
-        """)
-        rows = cur.fetchall()
+@app.get("/api/documents", response_class=ORJSONResponse)
+async def get_documents(
+    cursor: Optional[str] = None,
+    limit: int = Query(DOCUMENTS_PAGE_SIZE, ge=1, le=DOCUMENTS_MAX_PAGE_SIZE)
+):
+    """
+    Get documents newest first - matches Google's /api/documents.
+    When more documents remain, the X-Next-Cursor response header holds the
+    cursor ("<created_at>|<id>" of the last document) for the next page.
+    """
+    before, before_id = None, None
+    if cursor:
+        created_at, _, before_id = cursor.partition("|")
+        try:
+            before = datetime.fromisoformat(created_at)
+        except ValueError:
+            before = None
+        # created_at is a naive TIMESTAMP column, so only naive cursors compare
+        if before is None or before.tzinfo is not None or not before_id:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
     
-    documents = []
-    for row in rows:
-        doc = Document(
-            id=row["id"],
-            filename=row["filename"],
-            content=row["content"] or "",
-            mime_type=row["mime_type"],
-            created_at=row["created_at"].isoformat(),
-            tags=row["tags"] if row["tags"][0] else [],
-            metadata=row["metadata"] or {}
+    async with app.state.pool.acquire() as conn:
+        # (created_at, id) is unique, so rows sharing a timestamp are never skipped
+        rows = await conn.fetch("""
+            SELECT * FROM documents
+            WHERE ($1::timestamp IS NULL OR (created_at, id) < ($1, $2::text))
+            ORDER BY created_at DESC, id DESC
+            LIMIT $3
+        """, before, before_id, limit)
+        
+        tag_rows = await conn.fetch(
+            "SELECT doc_id, tag FROM tags WHERE doc_id = ANY($1::text[])",
+            [row["id"] for row in rows]
         )
-        documents.append(doc)
     
-    return documents
+    tags_by_doc = defaultdict(list)
+    for tag_row in tag_rows:
+        tags_by_doc[tag_row["doc_id"]].append(tag_row["tag"])
+    
+    # Rows are already trusted database values, so serialize them directly
+    # rather than validating a Document model per row
+    documents = [
+        {
+            "id": row["id"],
+            "filename": row["filename"],
+            "content": row["content"] or "",
+            "mime_type": row["mime_type"],
+            "created_at": row["created_at"].isoformat(),
+            "tags": tags_by_doc[row["id"]],
+            "metadata": row["metadata"] or {},
+            "similarity": None
+        }
+        for row in rows
+    ]
+    
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers["X-Next-Cursor"] = f"{last['created_at'].isoformat()}|{last['id']}"
+    
+    return ORJSONResponse(content=documents, headers=headers)
 
 @app.post("/api/documents", response_model=Document)
 async def create_document(document: DocumentCreate):
@@ -224,48 +463,77 @@ async def create_document(document: DocumentCreate):
         # Generate tags and summary
         ai_data = generate_tags_and_summary(document.content, document.mimeType)
         
-        # Store in PostgreSQL
-        with db_conn.cursor() as cur:
-            cur.execute(
-                "INSERT INTO documents (id, filename, content, mime_type, metadata) VALUES (%s, %s, %s, %s, %s)",
-                (doc_id, document.filename, document.content, document.mimeType, json.dumps(ai_data))
+        # Generate embedding
+        text_to_embed = document.content if document.mimeType.startswith("text/") else ai_data["summary"]
+        embedding = await embedding_batcher.submit(text_to_embed)
+        quantized, scale = quantize_embedding(embedding)
+        
+        async def store_postgres():
+            async with app.state.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        "INSERT INTO documents (id, filename, content, mime_type, metadata) VALUES ($1, $2, $3, $4, $5)",
+                        doc_id, document.filename, document.content, document.mimeType, ai_data
+                    )
+
+                    # Store tags in one COPY instead of a round-trip per tag
+                    await conn.copy_records_to_table(
+                        "tags",
+                        records=[(doc_id, tag) for tag in ai_data["tags"]],
+                        columns=["doc_id", "tag"]
+                    )
+        
+        async def store_chroma():
+            await app.state.chroma_collection.add(
+                ids=[doc_id],
+                # Whole-number floats serialize far shorter than raw float32 values
+                embeddings=quantized.astype(np.float32)[np.newaxis],
+                metadatas=[{
+                    "filename": document.filename,
+                    "mime_type": document.mimeType,
+                    "tags": encode_json(ai_data["tags"]),
+                    "embedding_scale": scale
+                }],
+                documents=[text_to_embed[:1000]]  # Store first 1000 chars
             )
-            
-            # Store tags
-            for tag in ai_data["tags"]:
-                cur.execute(
-                    "INSERT INTO tags (doc_id, tag) VALUES (%s, %s)",
-                    (doc_id, tag)
+        
+        async def store_redis():
+            # Only a cache, so a Redis failure must not fail the upload
+            try:
+                await redis_client.setex(
+                    f"document:{doc_id}",
+                    3600,  # 1 hour TTL
+                    orjson.dumps({
+                        "id": doc_id,
+                        "filename": document.filename,
+                        "tags": ai_data["tags"],
+                        "summary": ai_data["summary"]
+                    })
                 )
+            except RedisError as e:
+                print(f"Document cache write failed: {e}")
         
-        db_conn.commit()
+        async def remove_postgres():
+            async with app.state.pool.acquire() as conn:
+                await conn.execute("DELETE FROM documents WHERE id = $1", doc_id)
         
-        # Generate embedding and store in ChromaDB
-        text_to_embed = document.content if document.mimeType.startswith("text/") else ai_data["summary"]
-        embedding = ai_model.encode(text_to_embed).tolist()
+        async def remove_chroma():
+            await app.state.chroma_collection.delete(ids=[doc_id])
         
-        chroma_collection.add(
-            ids=[doc_id],
-            embeddings=[embedding],
-            metadatas=[{
-                "filename": document.filename,
-                "mime_type": document.mimeType,
-                "tags": json.dumps(ai_data["tags"])
-            }],
-            documents=[text_to_embed[:1000]]  # Store first 1000 chars
-        )
-        
-        # Cache in Redis
-        redis_client.setex(
-            f"document:{doc_id}",
-            3600,  # 1 hour TTL
-            json.dumps({
-                "id": doc_id,
-                "filename": document.filename,
-                "tags": ai_data["tags"],
-                "summary": ai_data["summary"]
-            })
+        # The three stores are independent, so write them concurrently
+        results = await asyncio.gather(
+            store_postgres(), store_chroma(), store_redis(),
+            return_exceptions=True
         )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            # Undo the PostgreSQL/ChromaDB writes that did land so the two stay consistent
+            undo = [remove_postgres, remove_chroma]
+            await asyncio.gather(
+                *(remove() for remove, result in zip(undo, results) if not isinstance(result, Exception)),
+                return_exceptions=True
+            )
+            raise errors[0]
         
         # Return document in Google's format
         return Document(
@@ -279,7 +547,6 @@ async def create_document(document: DocumentCreate):
         )
         
     except Exception as e:
-        db_conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to process document: {str(e)}")
 
 @app.post("/api/search", response_model=List[Document])
@@ -287,37 +554,34 @@ async def search_documents(query: SearchQuery):
     """Search documents - matches Google's /api/search"""
     try:
         # Generate query embedding
-        query_embedding = ai_model.encode(query.query).tolist()
+        query_embedding = await get_query_embedding(query.query)
         
         # Search in ChromaDB
-        results = chroma_collection.query(
-            query_embeddings=[query_embedding],
-            n_results=5,
-            include=["metadatas", "documents", "distances"]
-        )
+        doc_ids, distances = await search_batcher.submit(query_embedding)
         
-        if not results["ids"][0]:
+        if not doc_ids:
             return []
         
-        # Get document details from PostgreSQL
-        doc_ids = results["ids"][0]
-        similarities = [1 - distance for distance in results["distances"][0]]
+        similarities = {
+            doc_id: 1 - distance
+            for doc_id, distance in zip(doc_ids, distances)
+        }
         
-        with db_conn.cursor(cursor_factory=RealDictCursor) as cur:
-            placeholders = ",".join(["%s"] * len(doc_ids))
-            cur.execute(f"""
+        # Get document details from PostgreSQL. A single array parameter keeps
+        # the SQL text constant, so asyncpg reuses its cached prepared statement
+        async with app.state.pool.acquire() as conn:
+            rows = await conn.fetch("""
                 SELECT d.*, array_agg(t.tag) as tags
                 FROM documents d
                 LEFT JOIN tags t ON d.id = t.doc_id
-                WHERE d.id IN ({placeholders})
+                WHERE d.id = ANY($1::text[])
                 GROUP BY d.id
             """, doc_ids)
-            
-            rows = cur.fetchall()
         
-        # Create response matching Google's format
+        # Create response matching Google's format, best match first
+        rows = sorted(rows, key=lambda row: similarities[row["id"]], reverse=True)
         documents = []
-        for i, row in enumerate(rows):
+        for row in rows:
             doc = Document(
                 id=row["id"],
                 filename=row["filename"],
@@ -326,7 +590,7 @@ async def search_documents(query: SearchQuery):
                 created_at=row["created_at"].isoformat(),
                 tags=row["tags"] if row["tags"][0] else [],
                 metadata=row["metadata"] or {},
-                similarity=similarities[i]
+                similarity=similarities[row["id"]]
             )
             documents.append(doc)
         
@@ -339,22 +603,19 @@ async def search_documents(query: SearchQuery):
 async def delete_document(doc_id: str):
     """Delete a document - matches Google's /api/documents/:id DELETE"""
     try:
-        with db_conn.cursor() as cur:
+        async with app.state.pool.acquire() as conn:
             # Delete from PostgreSQL
-            cur.execute("DELETE FROM documents WHERE id = %s", (doc_id,))
-        
-        db_conn.commit()
+            await conn.execute("DELETE FROM documents WHERE id = $1", doc_id)
         
         # Delete from ChromaDB
-        chroma_collection.delete(ids=[doc_id])
+        await app.state.chroma_collection.delete(ids=[doc_id])
         
         # Delete from Redis cache
-        redis_client.delete(f"document:{doc_id}")
+        await redis_client.delete(f"document:{doc_id}")
         
         return {"success": True}
         
     except Exception as e:
-        db_conn.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
 
 @app.get("/health")
@@ -374,14 +635,31 @@ async def health_check():
 async def startup_event():
     """Initialize on startup"""
     print("OmniMind API starting up...")
+    app.state.pool = await init_database()
+    app.state.chroma_collection = await init_chromadb()
+    embedding_batcher.start()
+    search_batcher.start()
     print(f"Using AI model: {MODEL_NAME}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
-    db_conn.close()
+    await embedding_batcher.stop()
+    await search_batcher.stop()
+    await app.state.pool.close()
+    await redis_client.aclose()
     print("OmniMind API shutting down...")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run(
+        # An import string is only needed to spawn workers; with one worker it
+        # would re-import this module and load the model a second time
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8080,
+        loop="uvloop",
+        http="httptools",
+        workers=workers
+    )
\ No newline at end of file